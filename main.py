@@ -1,62 +1,546 @@
 import os
+import argparse
 import hashlib
-from collections import defaultdict
+import importlib.util
+import mmap
+import queue
+import shlex
+import sys
+import threading
+from array import array
+from collections import Counter, defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, nullcontext
+from itertools import compress
 from dotenv import load_dotenv
 
+def sha256_hasher():
+    """Create a SHA256 hasher backed by OpenSSL, which uses SHA-NI where the CPU has it."""
+    # usedforsecurity=False keeps FIPS-enabled OpenSSL 3 builds off the slower approved path
+    return hashlib.new('sha256', usedforsecurity=False)
+
+try:
+    # BLAKE3 is much faster than SHA256
+    from blake3 import blake3 as fast_hasher
+except ImportError:
+    # Without it, OpenSSL's SHA256 beats the stdlib BLAKE2 on any CPU with SHA-NI
+    fast_hasher = sha256_hasher
+
+try:
+    import resource
+except ImportError:
+    # Windows has no resource module
+    resource = None
+
+# File reads and hashing release the GIL, so several files are hashed at once
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Files under this many bytes are hashed with a single read and get no page cache hints
+TINY_FILE_SIZE = 4096
+
 def find_files(directory):
-    """Recursively find all files in a directory."""
-    for root, _, files in os.walk(directory):
-        for name in files:
-            yield os.path.join(root, name)
+    """Recursively find all files in a directory, yielding (path, name, stat_result) tuples."""
+    stack = [directory]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            # Skip directories we cannot list, like os.walk does
+            continue
+        with entries:
+            try:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            # The stat result is cached on the entry, so no extra syscall later
+                            yield entry.path, entry.name, entry.stat(follow_symlinks=False)
+                    except OSError:
+                        print(f"Warning: Could not access a file to check its size: {entry.path}")
+            except OSError:
+                # Reading the directory failed part way through; skip the rest of it, like os.walk does
+                continue
+
+def stream_files(directory, batch_size=256, max_batches=1024):
+    """Run find_files on a background thread and yield its results as they arrive.
+
+    Results are passed through a bounded queue in batches, so the caller can
+    work on files while the walk is still listing directories.
+    """
+    batches = queue.Queue(maxsize=max_batches)
+
+    def produce():
+        batch = []
+        try:
+            for item in find_files(directory):
+                batch.append(item)
+                if len(batch) == batch_size:
+                    batches.put(batch)
+                    batch = []
+            if batch:
+                batches.put(batch)
+            # None marks the end of the walk
+            batches.put(None)
+        except BaseException as e:
+            # Hand the error to the consumer, so a failed walk isn't mistaken for a finished one
+            batches.put(e)
+
+    threading.Thread(target=produce, daemon=True).start()
+    while (batch := batches.get()) is not None:
+        if isinstance(batch, BaseException):
+            raise batch
+        yield from batch
+
+def split_name(name):
+    """Split a file name into (stem, ext) the same way os.path.splitext does, but faster."""
+    stem, dot, ext = name.rpartition('.')
+    # Leading dots (as in .bashrc) don't start an extension
+    if not stem.strip('.'):
+        return name, ''
+    return stem, dot + ext
+
+# The scanned files as parallel arrays: file i is paths[i], sizes[i], stems[i], exts[i],
+# and lives on inode inos[i] of device devs[i]. inos[i] is 0 when the file has no other
+# hard link, or when its inode is unknown, so it can't share an inode with another file.
+# Extensions are stored lower-cased, since they are only ever matched case-insensitively.
+FileSet = namedtuple('FileSet', ['paths', 'sizes', 'stems', 'exts', 'devs', 'inos'])
+
+def scan_files(directory, executor=None, sample_bytes=65536):
+    """Scan a directory once and return (file_set, fingerprints).
+
+    The directory walk runs on a background thread. With an executor, every
+    file large enough to fingerprint is submitted to it as soon as another
+    distinct file of the same size turns up, so fingerprinting overlaps the
+    scan. fingerprints maps those paths to their quick_fingerprint futures.
+    """
+    file_set = FileSet(paths=[], sizes=array('q'), stems=[], exts=[], devs=array('Q'), inos=array('Q'))
+    fingerprints = {}
+    # First distinct file seen for each size, until a second one arrives
+    first_of_size = {}
+    seen_inodes = set()
+    for file_path, name, stat in stream_files(directory):
+        # Split each name exactly once; later passes only read stems or exts
+        stem, ext = split_name(name)
+        file_set.paths.append(file_path)
+        file_set.sizes.append(stat.st_size)
+        file_set.stems.append(stem)
+        file_set.exts.append(ext.lower())
+        # On Windows the scandir stat leaves st_ino and st_nlink at 0, so no file there is
+        # taken for a hard link; it is read like any other file instead
+        ino = stat.st_ino if stat.st_nlink > 1 else 0
+        file_set.devs.append(stat.st_dev)
+        file_set.inos.append(ino)
+
+        size = stat.st_size
+        if executor is None or not sample_bytes or size <= 2 * sample_bytes:
+            continue
+        if ino:
+            # Hard links are never read twice; only the first path to an inode is fingerprinted
+            inode = (stat.st_dev, ino)
+            if inode in seen_inodes:
+                continue
+            seen_inodes.add(inode)
+        first = first_of_size.setdefault(size, file_path)
+        if first is file_path:
+            continue
+        if first not in fingerprints:
+            fingerprints[first] = executor.submit(quick_fingerprint, first, size, sample_bytes)
+        fingerprints[file_path] = executor.submit(quick_fingerprint, file_path, size, sample_bytes)
+    return file_set, fingerprints
+
+def group_by_name(stems, indices=None):
+    """Group file indices by file name, ignoring extensions.
 
-def group_by_name(files):
-    """Group files by their names, ignoring extensions."""
+    Only the files at the given indices are grouped; by default all of them.
+    """
+    if indices is None:
+        indices = range(len(stems))
+        selected = stems
+    else:
+        selected = list(map(stems.__getitem__, indices))
+    # Count names in C first, so the Python loop below only sees duplicated names
+    counts = Counter(selected)
+    duplicated = {name for name, count in counts.items() if count > 1}
     groups = defaultdict(list)
-    for file_path in files:
-        # os.path.splitext splits the path into a pair (root, ext)
-        # We take the root part of the filename as the key.
-        file_name_without_extension = os.path.splitext(os.path.basename(file_path))[0]
-        groups[file_name_without_extension].append(file_path)
-    # Return only those names that have more than one file path (i.e., duplicates)
-    return {name: paths for name, paths in groups.items() if len(paths) > 1}
-
-def hash_file(path, block_size=65536):
-    """Generate SHA256 hash for a file."""
-    hasher = hashlib.sha256()
+    for i, name in compress(zip(indices, selected), map(duplicated.__contains__, selected)):
+        groups[name].append(i)
+    return dict(groups)
+
+# Each hashing thread keeps one read buffer and reuses it for every file
+read_buffers = threading.local()
+
+def read_buffer(size):
+    """Return this thread's reusable read buffer of the given size, as a memoryview."""
+    view = getattr(read_buffers, 'view', None)
+    if view is None or len(view) != size:
+        view = read_buffers.view = memoryview(bytearray(size))
+    return view
+
+def fadvise(fd, *advice):
+    """Apply posix_fadvise hints, given as names like 'SEQUENTIAL', to a whole file.
+
+    Hints are best effort: they do nothing on platforms without
+    posix_fadvise, and a hint the kernel rejects is ignored.
+    """
+    if hasattr(os, 'posix_fadvise'):
+        for name in advice:
+            try:
+                os.posix_fadvise(fd, 0, 0, getattr(os, 'POSIX_FADV_' + name))
+            except OSError:
+                pass
+
+def drop_cached_pages(path):
+    """Ask the kernel to drop a file's pages from the page cache, if it can be opened."""
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    except OSError:
+        return
     try:
-        with open(path, 'rb') as f:
-            # Read the file in chunks to handle large files efficiently
-            for chunk in iter(lambda: f.read(block_size), b''):
-                hasher.update(chunk)
-        return hasher.hexdigest()
-    except IOError:
-        # Return None if the file cannot be read
+        fadvise(fd, 'DONTNEED')
+    finally:
+        os.close(fd)
+
+def digest_tiny_file(hasher, path, block_size=4096):
+    """Hash a small file with plain os.read calls and no readahead hints."""
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        # A short read means end of file, so a file under block_size takes a single read
+        while len(data := os.read(fd, block_size)) == block_size:
+            hasher.update(data)
+        hasher.update(data)
+    finally:
+        os.close(fd)
+
+def digest_medium_file(hasher, path, block_size=1 << 20, drop_cache=True):
+    """Hash a file through this thread's reusable read buffer."""
+    with open(path, 'rb', buffering=0) as f:
+        fd = f.fileno()
+        # The file is read front to back: widen readahead and start it right away
+        fadvise(fd, 'SEQUENTIAL', 'WILLNEED')
+        # Read in large blocks into a reused buffer: fewer syscalls, no new bytes per block
+        view = read_buffer(block_size)
+        while (count := f.readinto(view)):
+            hasher.update(view[:count])
+        if drop_cache:
+            # Drop the hashed pages so a large scan doesn't evict hotter data from the cache
+            fadvise(fd, 'DONTNEED')
+
+def digest_large_file(hasher, path, drop_cache=True):
+    """Hash a large file straight from a memory map of the page cache."""
+    with open(path, 'rb') as f:
+        fd = f.fileno()
+        fadvise(fd, 'SEQUENTIAL', 'WILLNEED')
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, 'madvise'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+                mm.madvise(mmap.MADV_WILLNEED)
+            with memoryview(mm) as view:
+                hasher.update(view)
+        if drop_cache:
+            fadvise(fd, 'DONTNEED')
+
+def digest_file(path, size=None, hasher_factory=fast_hasher, tiny_threshold=TINY_FILE_SIZE, mmap_threshold=1 << 20,
+                drop_cache=True):
+    """Return the raw hash digest (bytes) of a file.
+
+    Hashes are only used to group equal files, so a fast non-cryptographic
+    hasher is used by default. Pass hasher_factory=sha256_hasher for SHA256.
+
+    Each size class gets its own routine: files under tiny_threshold bytes
+    take a single read, files of at least mmap_threshold bytes are hashed
+    from a memory map, and the rest go through a reused 1 MiB buffer.
+    Pass the size from the scan to save a stat call. With drop_cache=False
+    the hashed pages stay cached, for files that are about to be read again.
+    """
+    hasher = hasher_factory()
+    try:
+        if size is None:
+            size = os.stat(path).st_size
+        if size < tiny_threshold:
+            digest_tiny_file(hasher, path, tiny_threshold)
+        elif size < mmap_threshold:
+            digest_medium_file(hasher, path, drop_cache=drop_cache)
+        else:
+            digest_large_file(hasher, path, drop_cache=drop_cache)
+        return hasher.digest()
+    except (OSError, ValueError):
+        # Return None if the file cannot be read (mmap raises ValueError if it was emptied since the scan)
         print(f"Warning: Could not read file to hash: {path}")
         return None
 
-def find_duplicates_by_content(files):
-    """Find duplicate files by comparing their hashes."""
+def quick_fingerprint(path, size, sample_bytes=65536):
+    """Return a digest of the first and last sample_bytes of a file and its size."""
+    hasher = fast_hasher()
+    try:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Only the pages touched by the two slices are read from disk
+            hasher.update(mm[:sample_bytes])
+            hasher.update(mm[-sample_bytes:])
+        hasher.update(size.to_bytes(8, 'little'))
+        return hasher.digest()
+    except (OSError, ValueError):
+        # mmap raises ValueError if the file was emptied since it was scanned
+        print(f"Warning: Could not read file to hash: {path}")
+        return None
+
+def group_by_size(file_set):
+    """Group the file indices of a FileSet by size."""
+    groups = {}
+    for i, size in enumerate(file_set.sizes):
+        # Most sizes are unique, so store a bare index and only make a list for a second file
+        group = groups.get(size)
+        if group is None:
+            groups[size] = i
+        elif type(group) is int:
+            groups[size] = [group, i]
+        else:
+            group.append(i)
+    # Files with a unique size cannot have a duplicate, so drop them here
+    return {size: group for size, group in groups.items() if type(group) is list}
+
+def collapse_hardlinks(file_set, indices, aliases):
+    """Return one path per distinct inode among the given file indices.
+
+    Every other path to an inode already seen is added to aliases, under the
+    path that was returned for that inode. Files with no known hard link
+    (inos[i] == 0) are always returned.
+    """
+    first_paths = {}
+    distinct = []
+    for i in indices:
+        file_path = file_set.paths[i]
+        ino = file_set.inos[i]
+        first = first_paths.setdefault((file_set.devs[i], ino), file_path) if ino else file_path
+        if first is file_path:
+            distinct.append(file_path)
+        else:
+            aliases[first].append(file_path)
+    return distinct
+
+def matching_files(original, others, block_size=1 << 20, drop_cache=True):
+    """Compare the files in others with original and return (matching, different).
+
+    matching holds the files whose contents equal original's and different
+    the ones that differ from it. Files that cannot be read are in neither.
+    If original itself cannot be read, all of others are returned as
+    different, to be compared with each other instead.
+
+    All files are read together, block by block, so each is read only once.
+    With drop_cache=False their pages are left in the page cache afterwards.
+    """
+    with ExitStack() as stack:
+        try:
+            reference = stack.enter_context(open(original, 'rb'))
+        except OSError:
+            print(f"Warning: Could not read file to compare: {original}")
+            return [], list(others)
+        files = {}
+        different = []
+        opened = []
+        for file_path in others:
+            try:
+                files[file_path] = stack.enter_context(open(file_path, 'rb'))
+                opened.append(files[file_path])
+            except OSError:
+                # Not a collision: the file could not be compared, e.g. out of file descriptors
+                print(f"Warning: Could not read file to compare: {file_path}")
+        try:
+            while files:
+                block = reference.read(block_size)
+                for file_path, f in list(files.items()):
+                    try:
+                        if f.read(block_size) != block:
+                            print(f"Warning: Hash collision, not a duplicate of {original}: {file_path}")
+                            different.append(file_path)
+                            del files[file_path]
+                    except OSError:
+                        print(f"Warning: Could not read file to compare: {file_path}")
+                        del files[file_path]
+                if not block:
+                    break
+        except OSError:
+            # Only reading the original can get here; nothing can be confirmed against it
+            print(f"Warning: Could not read file to compare: {original}")
+            return [], list(others)
+        finally:
+            # The hash pass kept these pages cached for this read; nothing reads them after it
+            if drop_cache:
+                for f in opened:
+                    fadvise(f.fileno(), 'DONTNEED')
+        return list(files), different
+
+def open_files_per_worker(workers, max_open=64):
+    """Return how many files each of workers concurrent comparisons may keep open.
+
+    All workers share the process limit on open files (RLIMIT_NOFILE), and
+    half of it is left for everything else. The result is between 2 and
+    max_open.
+    """
+    if resource is None:
+        # The Windows C runtime allows 512 open files by default
+        limit = 512
+    else:
+        limit = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+        if limit == resource.RLIM_INFINITY:
+            return max_open
+    return max(2, min(max_open, limit // 2 // workers))
+
+def verify_duplicates(paths, max_open=64, drop_cache=True):
+    """Split paths into groups of files that are byte-for-byte identical.
+
+    The files are compared against the first one in batches of at most
+    max_open - 1 files, so large groups don't run out of file descriptors.
+    The files that differ from it may still match each other, so they are
+    split the same way against the first of them, until none are left.
+    Files that cannot be read are left out. With drop_cache=True the
+    compared files are dropped from the page cache afterwards.
+    """
+    groups = []
+    while paths:
+        original = paths[0]
+        verified = [original]
+        different = []
+        for start in range(1, len(paths), max_open - 1):
+            matching, rest = matching_files(original, paths[start:start + max_open - 1], drop_cache=drop_cache)
+            verified.extend(matching)
+            different.extend(rest)
+        if drop_cache:
+            drop_cached_pages(original)
+        groups.append(verified)
+        paths = different
+    return groups
+
+def find_duplicates_by_content(file_set, sample_bytes=65536, hasher_factory=fast_hasher, verify=None,
+                               max_workers=DEFAULT_WORKERS, executor=None, fingerprints=None):
+    """Find duplicate files by comparing their hashes.
+
+    Only files sharing a size are hashed. Within each size group a quick
+    fingerprint of the first and last sample_bytes splits the group further,
+    and the full hash is computed only for files whose fingerprints still
+    match. Pass sample_bytes=None to skip the fingerprint pass.
+
+    Hard links to the same inode are identical by definition, so only one
+    path per inode is read; the others are added to its group afterwards.
+
+    With verify=True, files in each hash group are also compared byte by
+    byte, so a collision in the fast hasher can't report a false duplicate.
+    By default this is done for every hasher except SHA256, which is
+    collision resistant on its own.
+
+    Returns a list of (digest, paths) pairs, one per group of duplicates.
+    Verification can split the files of one digest into several groups,
+    which then share the digest.
+
+    Hashing runs on the given executor, or on a new pool of max_workers
+    threads. With an executor, pass its worker count as max_workers too: it
+    sets how many files each comparison may open. fingerprints may hold quick_fingerprint futures already started
+    by scan_files; they are used instead of fingerprinting those files again.
+    """
+    if fingerprints is None:
+        fingerprints = {}
+    if verify is None:
+        verify = hasher_factory is not sha256_hasher
+
+    aliases = defaultdict(list)
+    quick_jobs = []
+    full_jobs = []
+    for size, group in group_by_size(file_set).items():
+        paths = collapse_hardlinks(file_set, group, aliases)
+        # The fingerprint is only useful when it reads less than the whole file
+        # and there is another distinct file to tell apart
+        jobs = quick_jobs if sample_bytes and size > 2 * sample_bytes and len(paths) > 1 else full_jobs
+        jobs.extend((size, file_path) for file_path in paths)
+
     hashes = defaultdict(list)
-    for file_path in files:
-        file_hash = hash_file(file_path)
-        if file_hash:
-            hashes[file_hash].append(file_path)
-    # Return only those hashes that have more than one file path (i.e., duplicates)
-    return {h: paths for h, paths in hashes.items() if len(paths) > 1}
+    pool = ThreadPoolExecutor(max_workers=max_workers) if executor is None else nullcontext(executor)
+    with pool as executor:
+        quick_groups = defaultdict(list)
+        quick_futures = [
+            fingerprints.get(file_path) or executor.submit(quick_fingerprint, file_path, size, sample_bytes)
+            for size, file_path in quick_jobs
+        ]
+        for (size, file_path), future in zip(quick_jobs, quick_futures):
+            fingerprint = future.result()
+            if fingerprint is not None:
+                quick_groups[(size, fingerprint)].append(file_path)
+        # Files whose fingerprint matches no other file of the same size are unique,
+        # unless they have hard links, which still need a hash to be reported
+        for (size, _), paths in quick_groups.items():
+            if len(paths) > 1 or paths[0] in aliases:
+                full_jobs.extend((size, file_path) for file_path in paths)
+
+        # Submit the largest files first so every worker stays busy until the end
+        full_jobs.sort(key=lambda job: job[0], reverse=True)
+        # Files that will be verified keep their pages cached until the comparison has read them
+        file_hashes = executor.map(
+            lambda job: digest_file(job[1], job[0], hasher_factory=hasher_factory, drop_cache=not verify), full_jobs)
+        for (_, file_path), file_hash in zip(full_jobs, file_hashes):
+            if file_hash is not None:
+                hashes[file_hash].append(file_path)
+
+        # Return only those hashes that have more than one file path (i.e., duplicates)
+        duplicates = [(h, paths) for h, paths in hashes.items() if len(paths) > 1 or paths[0] in aliases]
+        if verify:
+            # Hashed files without a match won't be compared, so drop their pages now
+            candidates = {file_path for _, paths in duplicates for file_path in paths}
+            # Tiny files are hashed without cache hints, so their pages are left alone, as digest_file does
+            list(executor.map(drop_cached_pages, (p for size, p in full_jobs
+                                                  if size >= TINY_FILE_SIZE and p not in candidates)))
+            sizes = {file_path: size for size, file_path in full_jobs}
+            # Every worker may be comparing a group at once, so they split the open file limit
+            max_open = open_files_per_worker(max_workers)
+            verified = executor.map(
+                lambda paths: verify_duplicates(paths, max_open, drop_cache=sizes[paths[0]] >= TINY_FILE_SIZE),
+                (paths for _, paths in duplicates))
+            duplicates = [(h, group) for (h, _), groups in zip(duplicates, verified) for group in groups
+                          if len(group) > 1 or group[0] in aliases]
+    # Hard links were never read, so bring them back in next to the path that was
+    return [(h, [p for file_path in paths for p in (file_path, *aliases.get(file_path, ()))])
+            for h, paths in duplicates]
 
 def generate_rm_commands(duplicates):
-    """Generate 'rm' commands for duplicate files."""
-    commands = []
+    """Generate 'rm' commands for duplicate files, quoted for the shell."""
     # The 'duplicates' dictionary is expected to have the original file path as the key
     # and a list of duplicate file paths as the value.
-    for _, dup_list in duplicates.items():
-        for duplicate in dup_list:
-            # Escape spaces and other special characters for shell command
-            commands.append(f"rm '{duplicate}'")
-    return commands
+    return [f"rm {shlex.quote(duplicate)}" for dup_list in duplicates.values() for duplicate in dup_list]
+
+def delete_file(path):
+    """Delete a file, returning True on success."""
+    try:
+        os.unlink(path)
+        return True
+    except OSError as e:
+        print(f"Warning: Could not delete file: {e}")
+        return False
+
+def apply_deletions(duplicates, max_workers=DEFAULT_WORKERS):
+    """Delete duplicate files directly and return the paths that were removed."""
+    paths = [duplicate for dup_list in duplicates.values() for duplicate in dup_list]
+    # unlink releases the GIL, so deletions run on a thread pool
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return [path for path, deleted in zip(paths, executor.map(delete_file, paths)) if deleted]
+
+def positive_int(value):
+    """argparse type for options that must be a whole number of at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
 
 def main():
     """Main function to find and report duplicates."""
+    parser = argparse.ArgumentParser(description="Find duplicate files by name and by content.")
+    parser.add_argument("--crypto", action="store_true",
+                        help="hash file contents with SHA256 instead of the fast hasher")
+    parser.add_argument("--workers", type=positive_int, default=DEFAULT_WORKERS,
+                        help="number of files hashed in parallel (default: 4 per CPU, at most 32); "
+                             "raise it on fast SSDs to keep more reads in flight")
+    parser.add_argument("--apply", action="store_true",
+                        help="delete the content duplicates directly instead of only printing rm commands; "
+                             "name duplicates are never deleted automatically")
+    args = parser.parse_args()
+
     load_dotenv()
     lookup_folder = os.getenv("LOOKUP_FOLDER")
 
@@ -66,70 +550,79 @@ def main():
         return
 
     print(f"Scanning for files in: {lookup_folder}\n")
-    all_files = list(find_files(lookup_folder))
+    # One pool serves both the fingerprints started during the scan and the content pass
+    executor = ThreadPoolExecutor(max_workers=args.workers)
+    file_set, fingerprints = scan_files(lookup_folder, executor)
 
     # --- Find duplicates by name ---
-    name_duplicates = group_by_name(all_files)
+    name_duplicates = group_by_name(file_set.stems)
     if name_duplicates:
-        print("--- Duplicates Found by Name (Keeping Largest File) ---")
-        name_rm_commands = []
-        for name, paths in name_duplicates.items():
-            # Sort paths by file size in descending order (largest first)
-            try:
-                paths.sort(key=os.path.getsize, reverse=True)
-            except FileNotFoundError as e:
-                print(f"Warning: Could not access a file to check its size: {e}")
-                continue
+        report = ["--- Duplicates Found by Name (Keeping Largest File) ---\n"]
+        name_deletions = {}
+        for name, group in name_duplicates.items():
+            # Sort file indices by file size in descending order (largest first)
+            group.sort(key=file_set.sizes.__getitem__, reverse=True)
 
-            original = paths[0]
-            duplicates = paths[1:]
+            original = file_set.paths[group[0]]
+            original_size = file_set.sizes[group[0]]
+            duplicates = [(file_set.paths[i], file_set.sizes[i]) for i in group[1:]]
             
             # Display file sizes for clarity
-            original_size = os.path.getsize(original)
-            print(f"\nOriginal: {original} ({original_size / 1024 / 1024:.2f} MB)")
-            
-            for dup in duplicates:
-                dup_size = os.path.getsize(dup)
-                print(f"Duplicate: {dup} ({dup_size / 1024 / 1024:.2f} MB)")
+            report.append(f"\nOriginal: {original} ({original_size / 1024 / 1024:.2f} MB)\n")
+            report.extend(f"Duplicate: {dup} ({dup_size / 1024 / 1024:.2f} MB)\n" for dup, dup_size in duplicates)
             
             if duplicates:
-                name_rm_commands.extend(generate_rm_commands({original: duplicates}))
+                name_deletions[original] = [dup for dup, _ in duplicates]
 
-        if name_rm_commands:
-            print("\n--- ZSH Commands to Remove Name Duplicates ---")
-            for cmd in name_rm_commands:
-                print(cmd)
+        if name_deletions:
+            report.append("\n--- ZSH Commands to Remove Name Duplicates ---\n")
+            report.extend(f"{cmd}\n" for cmd in generate_rm_commands(name_deletions))
+        # Emit the whole section with one write instead of a print per line
+        sys.stdout.write("".join(report))
         print("-" * 50)
     else:
         print("No duplicates found by name.\n")
 
 
     # --- Find duplicates by content ---
-    content_duplicates = find_duplicates_by_content(all_files)
+    if args.crypto:
+        if importlib.util.find_spec('_hashlib') is None:
+            print("Warning: Python was built without OpenSSL, so SHA256 runs without hardware acceleration.")
+            print("Install a Python linked against OpenSSL 1.1.1 or 3.x for faster --crypto hashing.\n")
+        content_duplicates = find_duplicates_by_content(
+            file_set, hasher_factory=sha256_hasher, max_workers=args.workers, executor=executor,
+            fingerprints=fingerprints)
+    else:
+        content_duplicates = find_duplicates_by_content(
+            file_set, max_workers=args.workers, executor=executor, fingerprints=fingerprints)
     if content_duplicates:
-        print("\n--- Duplicates Found by Content (File Hash) ---")
-        content_rm_commands = []
-        for file_hash, paths in content_duplicates.items():
+        report = ["\n--- Duplicates Found by Content (File Hash) ---\n"]
+        content_deletions = {}
+        for file_hash, paths in content_duplicates:
             # Sort paths alphabetically to have a consistent "original"
             paths.sort()
             original = paths[0]
             duplicates = paths[1:]
             
-            print(f"\nHash: {file_hash}")
-            print(f"Original: {original}")
-            for dup in duplicates:
-                print(f"Duplicate: {dup}")
+            report.append(f"\nHash: {file_hash.hex()}\nOriginal: {original}\n")
+            report.extend(f"Duplicate: {dup}\n" for dup in duplicates)
             
             if duplicates:
-                content_rm_commands.extend(generate_rm_commands({original: duplicates}))
+                content_deletions[original] = duplicates
 
-        if content_rm_commands:
-            print("\n--- ZSH Commands to Remove Content Duplicates ---")
-            for cmd in content_rm_commands:
-                print(cmd)
+        if content_deletions:
+            report.append("\n--- ZSH Commands to Remove Content Duplicates ---\n")
+            report.extend(f"{cmd}\n" for cmd in generate_rm_commands(content_deletions))
+        # Emit the whole section with one write instead of a print per line
+        sys.stdout.write("".join(report))
+        # Only content groups are deleted: they are confirmed identical, unlike name matches
+        if content_deletions and args.apply:
+            deleted = apply_deletions(content_deletions, max_workers=args.workers)
+            print(f"\nDeleted {len(deleted)} content duplicates.")
         print("-" * 50)
     else:
         print("No duplicates found by content.\n")
+    executor.shutdown()
 
 
 if __name__ == "__main__":